@@ -12,17 +12,41 @@ A typical run with 3 searches costs ~$0.10-$0.30 total
 """
 
 import os
+import re
+import sys
+import math
+import time
+import operator
 import asyncio
-from typing import Dict, List
+import hashlib
+import queue
+import atexit
+import shelve
+import sqlite3
+import logging
+import logging.handlers
+from array import array
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, List, Literal, NamedTuple, Optional, Tuple
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
 
 from agents import Agent, WebSearchTool, trace, Runner, function_tool
 from agents.model_settings import ModelSettings
+from openai import AsyncOpenAI
+from openai.types.responses import ResponseTextDeltaEvent
+from jiter import from_json
 
-import sendgrid
+import httpx
+import orjson
 from sendgrid.helpers.mail import Mail, Email, To, Content
 
+try:
+    import uvloop
+except ImportError:  # Windows, or interpreters without a uvloop wheel
+    uvloop = None
+
 
 # Load environment variables
 load_dotenv(override=True)
@@ -35,9 +59,45 @@ load_dotenv(override=True)
 # Number of web searches to perform (adjust based on budget)
 HOW_MANY_SEARCHES = int(os.environ.get('HOW_MANY_SEARCHES', 3))
 
-# Search context size: "low", "medium", or "high"
+# Search context size: "low", "medium", or "high" for every search, or "auto"
+# to use the size the planner picks for each search
 SEARCH_CONTEXT_SIZE = os.environ.get('SEARCH_CONTEXT_SIZE', 'low')
 
+# Credentials and email addresses, read once at import; main() reports any
+# that are missing before the workflow starts
+CREDENTIALS = SimpleNamespace(
+    openai_api_key=os.environ.get('OPENAI_API_KEY'),
+    sendgrid_api_key=os.environ.get('SENDGRID_API_KEY'),
+    sender_email=os.environ.get('SENDER_EMAIL'),
+    recipient_email=os.environ.get('RECIPIENT_EMAIL'),
+)
+
+# Semantic search cache: SQLite file and minimum cosine similarity for a hit
+SEARCH_CACHE_PATH = os.environ.get('SEARCH_CACHE_PATH', '.search_cache.sqlite3')
+SEARCH_CACHE_THRESHOLD = float(os.environ.get('SEARCH_CACHE_THRESHOLD', 0.92))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get('SEARCH_CACHE_MAX_ENTRIES', 2000))
+# Summaries older than this are searched again; set SEARCH_CACHE_ENABLED=false
+# to always search
+SEARCH_CACHE_TTL_HOURS = float(os.environ.get('SEARCH_CACHE_TTL_HOURS', 24))
+SEARCH_CACHE_ENABLED = os.environ.get('SEARCH_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+# Planner cache: shelve file holding plans from earlier runs
+PLAN_CACHE_PATH = os.environ.get('PLAN_CACHE_PATH', '.plan_cache')
+PLAN_CACHE_TTL_HOURS = float(os.environ.get('PLAN_CACHE_TTL_HOURS', 24))
+PLAN_CACHE_ENABLED = os.environ.get('PLAN_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+
+# Output goes through a queue: coroutines only enqueue records and a background
+# thread writes them out, so concurrent searches never block on stdout
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
 
 # ============================================================================
 # STRUCTURED OUTPUT SCHEMAS
@@ -45,16 +105,23 @@ SEARCH_CONTEXT_SIZE = os.environ.get('SEARCH_CONTEXT_SIZE', 'low')
 
 class WebSearchItem(BaseModel):
     """Schema for a single web search."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     reason: str = Field(
         description="Your reasoning for why this search is important to the query."
     )
     query: str = Field(
         description="The search term to use for the web search."
     )
+    context_size: Literal["low", "medium", "high"] = Field(
+        description="How much search context this query needs: low, medium, or high."
+    )
 
 
 class WebSearchPlan(BaseModel):
     """Schema for a complete search plan."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     searches: list[WebSearchItem] = Field(
         description="A list of web searches to perform to best answer the query."
     )
@@ -62,6 +129,8 @@ class WebSearchPlan(BaseModel):
 
 class ReportData(BaseModel):
     """Schema for the final research report."""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+    
     short_summary: str = Field(
         description="A short 2-3 sentence summary of the findings."
     )
@@ -77,9 +146,142 @@ class ReportData(BaseModel):
 # AGENT DEFINITIONS
 # ============================================================================
 
+# Prompt layout: static guidance and examples come first and any per-run values
+# (such as the number of searches) come last, so OpenAI's automatic prompt
+# caching can reuse the prefix. Caching starts at 1024 prompt tokens, which is
+# why the planner and search prompts carry stable guidance and examples (about
+# 1.1-1.2k tokens each; keep them above the threshold when editing). The writer
+# prompt is short and not cached. Per-query content (the query, search terms,
+# search results) is always sent as the user message. Example topics must not
+# overlap the demo queries or each other, and example summaries use placeholders,
+# so the model has neither a canned plan nor facts to copy.
+
 # Planner Agent - Decomposes queries into search terms
 PLANNER_INSTRUCTIONS = f"""You are a helpful research assistant. Given a query, come up with a set of web searches \
-to perform to best answer the query. Output {HOW_MANY_SEARCHES} terms to query for."""
+to perform to best answer the query.
+
+Guidelines for a good search plan:
+- Each search should cover a distinct angle of the query. Avoid near-duplicate searches that \
+would return the same pages.
+- Prefer specific, keyword-rich search terms over full questions. Include names of products, \
+organizations, people, standards, or time periods whenever the query implies them.
+- Cover the landscape first (overviews, comparisons, rankings), then depth (technical details, \
+benchmarks, case studies), then context (adoption, criticism, limitations, outlook).
+- When the query concerns recent events or a specific year, include the year in the search term.
+- When the query asks for a comparison, dedicate searches to the comparison itself as well as to \
+the most important individual items being compared.
+- When the query is about impact or trends, include at least one search that looks for data, \
+statistics, surveys, or reports rather than opinion pieces.
+- For each search, the reason should explain in one or two sentences what gap in the final \
+report the search is meant to fill.
+- Set context_size for each search to how much of the web results it needs: "low" for simple \
+facts, dates, definitions, or lists; "medium" for overviews and comparisons; "high" only when \
+the search needs deep synthesis across many sources, such as technical detail or conflicting \
+evidence. Larger sizes cost more, so use "high" sparingly.
+
+Example 1
+Query: How are cities adapting to extreme heat?
+Searches:
+- query: "urban heat adaptation strategies cities overview"
+  reason: Establish the main approaches cities use and how they are grouped.
+  context_size: medium
+- query: "cool roofs street trees surface temperature measurements"
+  reason: Gather measured effects of the most common physical interventions.
+  context_size: low
+- query: "heat action plan evaluation mortality outcomes"
+  reason: Find evidence of whether city heat plans reduce harm, and their limits.
+  context_size: high
+
+Example 2
+Query: Compare electric bikes and e-scooters for urban commuting
+Searches:
+- query: "e-bike vs e-scooter commuting comparison range cost"
+  reason: Lay out the practical differences riders weigh when choosing between them.
+  context_size: medium
+- query: "micromobility injury rates e-bike e-scooter study"
+  reason: Ground the safety comparison in data rather than anecdotes.
+  context_size: high
+- query: "e-scooter e-bike city regulations parking speed limits"
+  reason: Cover the rules that shape where and how each can be used.
+  context_size: low
+
+Example 3
+Query: Is solid-state battery technology ready for electric cars?
+Searches:
+- query: "solid-state battery commercialization timeline automakers"
+  reason: Identify production announcements and realistic dates from manufacturers.
+  context_size: low
+- query: "solid-state battery energy density cost comparison lithium-ion"
+  reason: Compare the technology against current batteries on key metrics.
+  context_size: medium
+- query: "solid-state battery manufacturing challenges dendrites scaling"
+  reason: Explain the technical obstacles that still block mass adoption.
+  context_size: high
+
+Example 4
+Query: Best practices for remote team management
+Searches:
+- query: "remote team management best practices research"
+  reason: Collect evidence-based recommendations rather than generic tips.
+  context_size: medium
+- query: "asynchronous communication tools remote teams"
+  reason: Cover the tooling and communication patterns that support distributed work.
+  context_size: low
+- query: "remote work productivity burnout survey"
+  reason: Capture the risks and measurable outcomes of remote management approaches.
+  context_size: low
+
+Example 5
+Query: How do central banks use interest rates to control inflation?
+Searches:
+- query: "monetary policy transmission interest rates inflation explained"
+  reason: Explain the mechanism linking policy rates to prices and demand.
+  context_size: medium
+- query: "Federal Reserve ECB rate hikes 2022 2023 inflation results"
+  reason: Provide recent real-world examples and their measured outcomes.
+  context_size: low
+- query: "criticism of interest rate policy inflation supply shocks"
+  reason: Cover the limits of rate policy when inflation is driven by supply.
+  context_size: high
+
+Example 6
+Query: What are the health effects of intermittent fasting?
+Searches:
+- query: "intermittent fasting randomized controlled trial weight loss results"
+  reason: Anchor claims in clinical trial evidence rather than testimonials.
+  context_size: medium
+- query: "intermittent fasting metabolic health insulin sensitivity meta-analysis"
+  reason: Summarize effects on biomarkers beyond weight.
+  context_size: high
+- query: "intermittent fasting risks side effects who should avoid"
+  reason: Make sure the report covers safety concerns and contraindications.
+  context_size: low
+
+Common mistakes to avoid:
+- Several searches that are rewordings of the query itself; each search must add a new angle.
+- Search terms so broad (e.g. "AI") or so narrow (a single forum post title) that results will \
+be off-topic or empty.
+- Questions phrased for a person ("what do experts think about...") instead of keyword searches.
+- Relying only on vendor material; include at least one search likely to surface independent \
+evaluations when the query concerns a product or company.
+- Ignoring the time frame the query implies, which returns outdated results.
+- Using "high" context_size by default; most searches only need "low" or "medium".
+
+Example 7
+Query: Compare PostgreSQL and MongoDB for a new web application
+Searches:
+- query: "PostgreSQL vs MongoDB comparison web applications"
+  reason: Lay out the general trade-offs between relational and document databases.
+  context_size: medium
+- query: "PostgreSQL JSONB performance benchmark MongoDB"
+  reason: Check whether PostgreSQL's document features close the gap on flexible schemas.
+  context_size: high
+- query: "MongoDB PostgreSQL hosting cost managed services"
+  reason: Compare the operational and hosting costs a new project would face.
+  context_size: low
+
+Return the searches as a structured plan; do not answer the query yourself. \
+Output {HOW_MANY_SEARCHES} terms to query for."""
 
 planner_agent = Agent(
     name="Planner Agent",
@@ -94,15 +296,120 @@ SEARCH_INSTRUCTIONS = """You are a research assistant. Given a search term, you
 produce a concise summary of the results. The summary must be 2-3 paragraphs and less than 300 \
 words. Capture the main points. Write succinctly, no need to have complete sentences or good \
 grammar. This will be consumed by someone synthesizing a report, so it's vital you capture the \
-essence and ignore any fluff. Do not include any additional commentary other than the summary itself."""
+essence and ignore any fluff. Do not include any additional commentary other than the summary itself.
 
-search_agent = Agent(
-    name="Search Agent",
-    instructions=SEARCH_INSTRUCTIONS,
-    tools=[WebSearchTool(search_context_size=SEARCH_CONTEXT_SIZE)],
-    model="gpt-4o-mini",
-    model_settings=ModelSettings(tool_choice="required"),
-)
+What to capture, in order of priority:
+- Concrete facts: names, versions, release dates, prices, figures, and measured results.
+- Claims that several sources agree on, and notable points where sources disagree.
+- Who is behind a statement (company announcement, independent benchmark, academic study, \
+news report, opinion piece), since the writer needs to weigh sources.
+- Recent developments, with dates, when the search term implies a time frame.
+- Limitations, risks, and criticism, not only positive coverage.
+
+What to leave out:
+- Marketing language, calls to action, and generic introductions.
+- Navigation text, cookie notices, author bios, and unrelated sidebars.
+- Repetition of the same point from multiple sources; state it once and note it is widely reported.
+- Speculation that is not attributed to a credible source.
+
+Style rules:
+- Telegraphic style is fine: short clauses, semicolons, and dashes are preferred over long prose.
+- Keep numbers exact as reported; include units and the year of the figure.
+- Name products and organizations exactly as written in the sources.
+- If results are thin or off-topic, say so in one sentence and summarize what was found.
+
+Adapting to the kind of search term:
+- Overview or comparison terms: list the main options or positions first, then the criteria \
+sources use to tell them apart, then any consensus ranking or recommendation.
+- Factual or date-driven terms: lead with the direct answer, then the source and date of the \
+figure, then any competing figures and why they differ.
+- Technical terms: explain the mechanism in plain terms, then the measured performance, then the \
+known trade-offs, failure modes, and open problems.
+- Data, statistics, or survey terms: give the headline numbers with sample size, population, \
+and year; note who ran the survey and any obvious bias in how it was run.
+- Criticism, risk, or limitation terms: summarize the strongest objections and who raises them, \
+and include any responses or counter-evidence the sources report.
+- Case study or adoption terms: name the organizations, what they deployed, the scale, and the \
+reported outcomes; separate measured results from stated intentions.
+
+Accuracy rules:
+- Report what the sources say, not what you expect them to say; do not fill gaps from memory.
+- Keep estimates, forecasts, and targets clearly marked as such, with who made them.
+- When sources give different numbers for the same thing, give the range and the sources rather \
+than picking one.
+- Keep the time frame explicit: "as of 2024" or "announced March 2025" instead of "currently".
+- Do not merge two different products, studies, or organizations that have similar names.
+
+The examples below show the expected shape and density only. Names and figures in them are \
+placeholders in angle brackets, not facts; never copy them into a summary.
+
+Example
+Search term: heat pump performance cold climate field study
+Reason for searching: Check how heat pumps perform in real winters rather than lab ratings.
+Summary:
+Field trials report efficiency falling as outdoor temperature drops - <Utility A> monitoring \
+study (<year>, <N> homes): seasonal efficiency <X> on average, about <Y> on the coldest days; \
+<Research lab B> finds cold-climate models keep heating output down to <temperature> while \
+older models need backup heat. Results depend heavily on installation quality and sizing.
+
+Sources agree on running costs only in part - savings vs gas depend on local energy prices; \
+<Agency C> estimates <range> lower bills, <Industry group D> higher; independent analyses note \
+both rely on assumed prices.
+
+Gaps - few multi-year studies; most data from <region>; little on apartment buildings.
+
+Example
+Search term: textile recycling technologies commercial scale
+Reason for searching: Find which fibre-to-fibre recycling methods are past the pilot stage.
+Summary:
+Mechanical recycling established but limited to lower-grade fibres; chemical methods scaling - \
+<Company A> plant (<year>, <capacity> tonnes/year) processes cotton blends; <Company B> polyester \
+depolymerisation at pilot stage, commercial plant announced for <year>.
+
+Sources agree sorting is the bottleneck - mixed fibres, dyes and coatings; <Agency C> estimates \
+under <share> of collected textiles recycled into new fibre; brand commitments often undated.
+
+Limits - capacity figures mostly from company announcements; few independent life-cycle \
+assessments; economics depend on virgin polyester prices.
+
+Example
+Search term: four-day work week trial results
+Reason for searching: Find measured outcomes of reduced-hours pilots.
+Summary:
+Pilot programmes report mostly positive self-reported outcomes - <Organiser A> trial (<year>, \
+<N> companies, <country>): <share> of firms continued afterwards; staff reported less burnout; \
+revenue roughly flat per company self-reports.
+
+Caveats recurring across sources - participating companies volunteered, so results may not \
+generalise; few trials include control groups; sector matters (office work vs shift-based work).
+
+Open questions - long-term productivity effects; effects in customer-facing and manufacturing \
+roles; independent replication limited."""
+
+
+# One agent per context size, so each search only pays for the context it needs
+search_agents = {
+    size: Agent(
+        name="Search Agent",
+        instructions=SEARCH_INSTRUCTIONS,
+        tools=[WebSearchTool(search_context_size=size)],
+        model="gpt-4o-mini",
+        model_settings=ModelSettings(tool_choice="required"),
+    )
+    for size in ("low", "medium", "high")
+}
+
+
+def context_size_for(item: WebSearchItem) -> str:
+    """Return the search context size used for an item under SEARCH_CONTEXT_SIZE."""
+    if SEARCH_CONTEXT_SIZE == "auto":
+        return item.context_size
+    return SEARCH_CONTEXT_SIZE
+
+
+def search_agent_for(item: WebSearchItem) -> Agent:
+    """Pick the search agent for an item based on SEARCH_CONTEXT_SIZE."""
+    return search_agents[context_size_for(item)]
 
 
 # Writer Agent - Synthesizes research into reports
@@ -133,18 +440,28 @@ report converted into clean, well presented HTML with an appropriate subject lin
 # FUNCTION TOOLS
 # ============================================================================
 
+# Shared HTTP client for SendGrid, so connections are reused across emails and
+# sending does not block the event loop
+SENDGRID_MAIL_SEND_URL = "https://api.sendgrid.com/v3/mail/send"
+sendgrid_http = httpx.AsyncClient(
+    timeout=30.0,
+    headers={"Authorization": f"Bearer {CREDENTIALS.sendgrid_api_key}"},
+)
+
+
 @function_tool
-def send_email(subject: str, html_body: str) -> Dict[str, str]:
+async def send_email(subject: str, html_body: str) -> Dict[str, str]:
     """Send out an email with the given subject and HTML body."""
-    sender_email = os.environ.get('SENDER_EMAIL')
-    recipient_email = os.environ.get('RECIPIENT_EMAIL')
-    
-    sg = sendgrid.SendGridAPIClient(api_key=os.environ.get('SENDGRID_API_KEY'))
-    from_email = Email(sender_email)
-    to_email = To(recipient_email)
+    from_email = Email(CREDENTIALS.sender_email)
+    to_email = To(CREDENTIALS.recipient_email)
     content = Content("text/html", html_body)
     mail = Mail(from_email, to_email, subject, content).get()
-    sg.client.mail.send.post(request_body=mail)
+    response = await sendgrid_http.post(
+        SENDGRID_MAIL_SEND_URL,
+        content=orjson.dumps(mail),
+        headers={"Content-Type": "application/json"},
+    )
+    response.raise_for_status()
     return {"status": "success"}
 
 
@@ -156,73 +473,487 @@ email_agent = Agent(
 )
 
 
+# ============================================================================
+# CACHES
+# ============================================================================
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries match."""
+    return " ".join(query.lower().split())
+
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)*")
+
+
+class _CachedSearch(NamedTuple):
+    context_size: str
+    numbers: Tuple[str, ...]
+    embedding: array
+    summary: str
+    created_at: float
+
+
+class SemanticSearchCache:
+    """
+    Persistent cache of search summaries keyed by query meaning.
+    
+    Lookups try an exact match on the SHA-256 of the context size and the
+    normalized query first, then fall back to the stored entry, for the same
+    context size and the same numbers (years, versions), whose embedding is
+    most similar to the new query. Entries live in a SQLite file so hits
+    survive restarts; they expire after ttl seconds, and the oldest are
+    evicted once there are more than max_entries.
+    """
+    
+    EMBEDDING_MODEL = "text-embedding-3-small"
+    
+    def __init__(
+        self,
+        path: str = SEARCH_CACHE_PATH,
+        threshold: float = SEARCH_CACHE_THRESHOLD,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+        ttl: float = SEARCH_CACHE_TTL_HOURS * 3600,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._path = path
+        # Created on first use, so importing this module needs neither an
+        # API key nor write access to the working directory
+        self._client: Optional[AsyncOpenAI] = None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._embeddings: Dict[str, array] = {}
+        # key -> entry with a unit-length embedding, oldest first
+        self._entries: Optional[OrderedDict[str, _CachedSearch]] = None
+    
+    @property
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self._path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_summaries ("
+                "key TEXT PRIMARY KEY, context_size TEXT, query TEXT, embedding BLOB, summary TEXT, "
+                "created_at REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(search_summaries)")}
+            if "created_at" not in columns:
+                # Files from before expiry was added; their rows count as expired
+                self._conn.execute(
+                    "ALTER TABLE search_summaries ADD COLUMN created_at REAL NOT NULL DEFAULT 0"
+                )
+            self._conn.commit()
+        return self._conn
+    
+    def _is_fresh(self, entry: _CachedSearch) -> bool:
+        return time.time() - entry.created_at < self.ttl
+    
+    def _loaded_entries(self) -> OrderedDict[str, _CachedSearch]:
+        """Read every unexpired entry into memory on first use, dropping the rest."""
+        if self._entries is None:
+            self._db.execute(
+                "DELETE FROM search_summaries WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+            self._db.commit()
+            self._entries = OrderedDict()
+            rows = self._db.execute(
+                "SELECT key, context_size, query, embedding, summary, created_at "
+                "FROM search_summaries ORDER BY rowid"
+            )
+            for key, context_size, query, blob, summary, created_at in rows:
+                vector = array("f")
+                vector.frombytes(blob)
+                self._entries[key] = _CachedSearch(
+                    context_size, self._numbers(query), vector, summary, created_at
+                )
+        return self._entries
+    
+    @staticmethod
+    def _key(query: str, context_size: str) -> str:
+        return hashlib.sha256(f"{context_size}:{normalize_query(query)}".encode()).hexdigest()
+    
+    @staticmethod
+    def _numbers(query: str) -> Tuple[str, ...]:
+        return tuple(_NUMBER_RE.findall(query))
+    
+    @staticmethod
+    def _best_match(
+        vector: array, context_size: str, numbers: Tuple[str, ...], entries: List[_CachedSearch]
+    ) -> Tuple[float, Optional[str]]:
+        # Stored vectors are unit length, so the dot product is the cosine.
+        # Queries that differ only in a year or version embed almost the same,
+        # so those must match exactly.
+        best_score, best_summary = 0.0, None
+        for entry in entries:
+            if entry.context_size != context_size or entry.numbers != numbers:
+                continue
+            score = sum(map(operator.mul, vector, entry.embedding))
+            if score > best_score:
+                best_score, best_summary = score, entry.summary
+        return best_score, best_summary
+    
+    async def _embed(self, query: str) -> array:
+        """Return the query's embedding, scaled to unit length."""
+        normalized = normalize_query(query)
+        if normalized not in self._embeddings:
+            if self._client is None:
+                self._client = AsyncOpenAI()
+            response = await self._client.embeddings.create(
+                model=self.EMBEDDING_MODEL,
+                input=normalized,
+            )
+            raw = response.data[0].embedding
+            norm = math.sqrt(sum(x * x for x in raw)) or 1.0
+            self._embeddings[normalized] = array("f", (x / norm for x in raw))
+        return self._embeddings[normalized]
+    
+    async def get(self, query: str, context_size: str) -> Optional[str]:
+        """Return a fresh cached summary for the query at this context size, or None on a miss."""
+        entries = self._loaded_entries()
+        entry = entries.get(self._key(query, context_size))
+        if entry is not None and self._is_fresh(entry):
+            return entry.summary
+        
+        candidates = [entry for entry in entries.values() if self._is_fresh(entry)]
+        if not candidates:
+            return None
+        
+        vector = await self._embed(query)
+        # The scan is pure Python, so keep it off the event loop
+        best_score, best_summary = await asyncio.to_thread(
+            self._best_match, vector, context_size, self._numbers(query), candidates
+        )
+        return best_summary if best_score >= self.threshold else None
+    
+    async def put(self, query: str, context_size: str, summary: str) -> None:
+        """Store the summary, persist it to disk, and evict the oldest entries over the cap."""
+        vector = await self._embed(query)
+        key = self._key(query, context_size)
+        created_at = time.time()
+        entries = self._loaded_entries()
+        entries.pop(key, None)
+        entries[key] = _CachedSearch(context_size, self._numbers(query), vector, summary, created_at)
+        
+        self._db.execute(
+            "INSERT OR REPLACE INTO search_summaries "
+            "(key, context_size, query, embedding, summary, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, context_size, query, vector.tobytes(), summary, created_at),
+        )
+        evicted = []
+        while len(entries) > self.max_entries:
+            evicted.append(entries.popitem(last=False)[0])
+        if evicted:
+            self._db.executemany("DELETE FROM search_summaries WHERE key = ?", [(k,) for k in evicted])
+        self._db.commit()
+
+
+search_cache = SemanticSearchCache()
+
+
+class PlanCache:
+    """
+    Cache of planner output keyed by normalized query.
+    
+    Recent plans are kept in an in-memory LRU and every plan is also written
+    to a shelve file, so repeated runs of the same query skip the planner.
+    The key includes a hash of the planner's model, instructions (which
+    embed HOW_MANY_SEARCHES), and output schema, so changing any of them
+    invalidates earlier plans. Plans older than ttl seconds, and stored plans
+    that no longer validate, are treated as misses.
+    """
+    
+    def __init__(self, path: str = PLAN_CACHE_PATH, maxsize: int = 256, ttl: float = PLAN_CACHE_TTL_HOURS * 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._path = path
+        # key -> (created_at, plan)
+        self._plans: OrderedDict[str, Tuple[float, WebSearchPlan]] = OrderedDict()
+        schema = orjson.dumps(WebSearchPlan.model_json_schema(), option=orjson.OPT_SORT_KEYS)
+        self._planner_hash = hashlib.sha256(
+            f"{planner_agent.model}|{planner_agent.instructions}|".encode() + schema
+        ).hexdigest()
+    
+    def _key(self, query: str) -> str:
+        return f"{self._planner_hash}:{normalize_query(query)}"
+    
+    def _remember(self, key: str, created_at: float, plan: WebSearchPlan) -> None:
+        self._plans[key] = (created_at, plan)
+        self._plans.move_to_end(key)
+        if len(self._plans) > self.maxsize:
+            self._plans.popitem(last=False)
+    
+    def _read(self, key: str) -> Optional[Tuple[float, str]]:
+        with shelve.open(self._path) as db:
+            return db.get(key)
+    
+    def _write(self, key: str, created_at: float, data: str) -> None:
+        with shelve.open(self._path) as db:
+            db[key] = (created_at, data)
+    
+    async def get(self, query: str) -> Optional[WebSearchPlan]:
+        """Return the cached plan for the query, or None on a miss."""
+        key = self._key(query)
+        if key in self._plans:
+            created_at, plan = self._plans[key]
+            if time.time() - created_at < self.ttl:
+                self._plans.move_to_end(key)
+                return plan
+            del self._plans[key]
+            return None
+        
+        # shelve blocks on file I/O, so keep it off the event loop
+        stored = await asyncio.to_thread(self._read, key)
+        # Plans stored before expiry was added are bare strings; treat them as expired
+        if not isinstance(stored, tuple) or time.time() - stored[0] >= self.ttl:
+            return None
+        
+        created_at, data = stored
+        try:
+            plan = WebSearchPlan.model_validate_json(data)
+        except ValidationError:
+            return None
+        self._remember(key, created_at, plan)
+        return plan
+    
+    async def put(self, query: str, plan: WebSearchPlan) -> None:
+        """Store the plan for the query in memory and on disk."""
+        key = self._key(query)
+        created_at = time.time()
+        self._remember(key, created_at, plan)
+        await asyncio.to_thread(self._write, key, created_at, plan.model_dump_json())
+
+
+plan_cache = PlanCache()
+
+
 # ============================================================================
 # RESEARCH WORKFLOW FUNCTIONS
 # ============================================================================
 
-async def plan_searches(query: str) -> WebSearchPlan:
+async def plan_searches(query: str, use_cache: bool = True) -> WebSearchPlan:
     """
     Use the planner agent to plan which searches to run for the query.
     
     Args:
         query: Research question or topic
+        use_cache: Reuse the plan from an earlier run of the same query.
+                   Ignored when PLAN_CACHE_ENABLED is off.
         
     Returns:
         Structured search plan with queries and reasoning
     """
-    print("📋 Planning searches...")
-    result = await Runner.run(planner_agent, f"Query: {query}")
-    plan = result.final_output
+    logger.info("📋 Planning searches...")
+    use_cache = use_cache and PLAN_CACHE_ENABLED
+    plan = await plan_cache.get(query) if use_cache else None
+    if plan is None:
+        result = await Runner.run(planner_agent, f"Query: {query}")
+        plan = result.final_output
+        if use_cache:
+            await plan_cache.put(query, plan)
+    else:
+        logger.info("   Using cached plan")
     
-    print(f"✅ Will perform {len(plan.searches)} searches:")
+    logger.info(f"✅ Will perform {len(plan.searches)} searches:")
     for i, search in enumerate(plan.searches, 1):
-        print(f"   {i}. {search.query}")
-        print(f"      Reason: {search.reason}")
+        logger.info(f"   {i}. {search.query}")
+        logger.info(f"      Reason: {search.reason}")
     
     return plan
 
 
-async def perform_searches(search_plan: WebSearchPlan) -> List[str]:
+async def stream_search_plan(query: str, use_cache: bool = True) -> AsyncIterator[WebSearchItem]:
+    """
+    Stream the planner's output and yield each search as soon as it is complete.
+    
+    The planner's JSON is parsed incrementally while it is generated, so the
+    first searches can start before the planner has finished the whole plan.
+    
+    Args:
+        query: Research question or topic
+        use_cache: Reuse the plan from an earlier run of the same query.
+                   Ignored when PLAN_CACHE_ENABLED is off.
+        
+    Yields:
+        Search items, in plan order
+    """
+    logger.info("📋 Planning searches...")
+    use_cache = use_cache and PLAN_CACHE_ENABLED
+    cached = await plan_cache.get(query) if use_cache else None
+    if cached is not None:
+        logger.info("   Using cached plan")
+        for i, item in enumerate(cached.searches, 1):
+            logger.info(f"   {i}. {item.query}")
+            logger.info(f"      Reason: {item.reason}")
+            yield item
+        return
+    
+    result = Runner.run_streamed(planner_agent, f"Query: {query}")
+    
+    buffer = ""
+    emitted = 0
+    async for event in result.stream_events():
+        if event.type != "raw_response_event" or not isinstance(event.data, ResponseTextDeltaEvent):
+            continue
+        
+        buffer += event.data.delta
+        try:
+            partial = from_json(buffer.encode(), partial_mode=True)
+        except ValueError:
+            continue
+        
+        # Incomplete strings are dropped in partial mode, so an item with all
+        # of its fields present has been fully emitted
+        searches = partial.get("searches", []) if isinstance(partial, dict) else []
+        while emitted < len(searches) and WebSearchItem.model_fields.keys() <= searches[emitted].keys():
+            item = WebSearchItem(**searches[emitted])
+            emitted += 1
+            logger.info(f"   {emitted}. {item.query}")
+            logger.info(f"      Reason: {item.reason}")
+            yield item
+    
+    # Anything the incremental parse missed is still in the validated output
+    for item in result.final_output.searches[emitted:]:
+        emitted += 1
+        logger.info(f"   {emitted}. {item.query}")
+        logger.info(f"      Reason: {item.reason}")
+        yield item
+    
+    if use_cache:
+        await plan_cache.put(query, result.final_output)
+    logger.info(f"✅ Planned {emitted} searches")
+
+
+async def perform_searches(search_plan: WebSearchPlan, use_cache: bool = True) -> List[str]:
     """
     Execute all searches in the plan concurrently.
     
     Args:
         search_plan: Plan containing search items
+        use_cache: Reuse cached summaries for the same or similar searches
         
     Returns:
-        List of search result summaries
+        Search result summaries, in plan order
     """
-    print(f"\n🔍 Executing {len(search_plan.searches)} searches in parallel...")
+    logger.info(f"\n🔍 Executing {len(search_plan.searches)} searches in parallel...")
+    
+    # Execute all searches concurrently; the task group cancels the remaining
+    # searches if one of them fails
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(search(item, use_cache)) for item in search_plan.searches]
     
-    # Create tasks for parallel execution
-    tasks = [
-        asyncio.create_task(search(item)) 
-        for item in search_plan.searches
-    ]
+    logger.info("✅ Finished searching")
+    # Plan order, not completion order, so the writer's input is deterministic
+    return [task.result() for task in tasks]
+
+
+async def plan_and_perform_searches(query: str, use_cache: bool = True) -> List[str]:
+    """
+    Plan and execute searches with planning and searching overlapped.
     
-    # Execute all searches concurrently
-    results = await asyncio.gather(*tasks)
+    Each search starts as soon as the planner emits it, rather than after the
+    full plan is available.
     
-    print("✅ Finished searching")
-    return results
+    Args:
+        query: Research question or topic
+        use_cache: Reuse the cached plan and cached summaries from earlier runs
+        
+    Returns:
+        Search result summaries, in plan order
+    """
+    async with asyncio.TaskGroup() as tg:
+        tasks = [
+            tg.create_task(search(item, use_cache))
+            async for item in stream_search_plan(query, use_cache)
+        ]
+        
+        logger.info(f"\n🔍 Waiting on {len(tasks)} searches running in parallel...")
+    
+    logger.info("✅ Finished searching")
+    return [task.result() for task in tasks]
 
 
-async def search(item: WebSearchItem) -> str:
+async def search(item: WebSearchItem, use_cache: bool = True) -> str:
     """
     Execute a single web search.
     
     Args:
         item: Search item with query and reasoning
+        use_cache: Reuse a cached summary for the same or a similar query.
+                   Pass False for time-sensitive queries. Ignored when
+                   SEARCH_CACHE_ENABLED is off.
         
     Returns:
         Concise summary of search results
     """
+    use_cache = use_cache and SEARCH_CACHE_ENABLED
+    if use_cache:
+        cached = await search_cache.get(item.query, context_size_for(item))
+        if cached is not None:
+            logger.info(f"   ✓ Cached: {item.query}")
+            return cached
+    
     input_msg = f"Search term: {item.query}\nReason for searching: {item.reason}"
-    result = await Runner.run(search_agent, input_msg)
-    print(f"   ✓ Completed: {item.query}")
+    result = await Runner.run(search_agent_for(item), input_msg)
+    logger.info(f"   ✓ Completed: {item.query}")
+    
+    if use_cache:
+        await search_cache.put(item.query, context_size_for(item), result.final_output)
     return result.final_output
 
 
+_WORD_RE = re.compile(r"\S+")
+
+
+def count_words(text: str) -> int:
+    """Count whitespace-separated words without building a list of them."""
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
+
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+def _sentence_key(sentence: str) -> str:
+    """Normalize case, whitespace, and punctuation so only wording differences remain."""
+    return " ".join(_PUNCTUATION_RE.sub("", sentence.lower()).split())
+
+
+def format_search_results(search_results: List[str]) -> str:
+    """
+    Join search summaries into a compact block for the writer agent.
+    
+    Each summary gets its own heading, and sentences that an earlier summary
+    already contains word for word (ignoring case and punctuation) are
+    dropped. Near matches are kept, since sentences that differ only in a
+    version, date, or figure carry distinct facts. Sections left empty are
+    skipped.
+    
+    Args:
+        search_results: List of search summaries
+        
+    Returns:
+        Markdown text with one section per search
+    """
+    seen = set()
+    sections = []
+    
+    for i, summary in enumerate(search_results, 1):
+        lines = []
+        for line in summary.strip().splitlines():
+            sentences = []
+            for sentence in _SENTENCE_END_RE.split(line.strip()):
+                key = _sentence_key(sentence)
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                sentences.append(sentence)
+            if sentences:
+                lines.append(" ".join(sentences))
+        if lines:
+            sections.append(f"### Search {i}\n" + "\n".join(lines))
+    
+    return "\n\n---\n\n".join(sections)
+
+
 async def write_report(query: str, search_results: List[str]) -> ReportData:
     """
     Synthesize search results into a comprehensive report.
@@ -234,16 +965,16 @@ async def write_report(query: str, search_results: List[str]) -> ReportData:
     Returns:
         Structured report with summary, full text, and follow-ups
     """
-    print("\n📝 Generating comprehensive report...")
+    logger.info("\n📝 Generating comprehensive report...")
     
-    input_msg = f"Original query: {query}\nSummarized search results: {search_results}"
+    input_msg = f"Original query: {query}\nSummarized search results:\n\n{format_search_results(search_results)}"
     result = await Runner.run(writer_agent, input_msg)
     
     report = result.final_output
-    print("✅ Report generated")
-    print(f"   Summary: {report.short_summary}")
-    print(f"   Word count: ~{len(report.markdown_report.split())} words")
-    print(f"   Follow-up questions: {len(report.follow_up_questions)}")
+    logger.info("✅ Report generated")
+    logger.info(f"   Summary: {report.short_summary}")
+    logger.info(f"   Word count: ~{count_words(report.markdown_report)} words")
+    logger.info(f"   Follow-up questions: {len(report.follow_up_questions)}")
     
     return report
 
@@ -255,35 +986,35 @@ async def email_report(report: ReportData) -> None:
     Args:
         report: Report data to send
     """
-    print("\n📧 Sending email...")
+    logger.info("\n📧 Sending email...")
     result = await Runner.run(email_agent, report.markdown_report)
-    print("✅ Email sent successfully!")
+    logger.info("✅ Email sent successfully!")
 
 
 # ============================================================================
 # MAIN RESEARCH FUNCTION
 # ============================================================================
 
-async def conduct_research(query: str) -> ReportData:
+async def conduct_research(query: str, use_cache: bool = True) -> ReportData:
     """
     Execute the complete research workflow.
     
     Args:
         query: Research question or topic
+        use_cache: Reuse cached results from earlier runs; pass False for
+                   time-sensitive queries
         
     Returns:
         Final research report
     """
-    print("\n" + "="*60)
-    print(f"🔬 DEEP RESEARCH: {query}")
-    print("="*60 + "\n")
+    logger.info("\n" + "="*60)
+    logger.info(f"🔬 DEEP RESEARCH: {query}")
+    logger.info("="*60 + "\n")
     
     with trace("Deep Research Workflow"):
-        # Step 1: Plan searches
-        search_plan = await plan_searches(query)
-        
-        # Step 2: Execute searches in parallel
-        search_results = await perform_searches(search_plan)
+        # Steps 1-2: Plan searches and execute them in parallel, starting each
+        # search as soon as it is planned
+        search_results = await plan_and_perform_searches(query, use_cache)
         
         # Step 3: Synthesize into report
         report = await write_report(query, search_results)
@@ -291,9 +1022,9 @@ async def conduct_research(query: str) -> ReportData:
         # Step 4: Email the report
         await email_report(report)
     
-    print("\n" + "="*60)
-    print("🎉 RESEARCH COMPLETED!")
-    print("="*60 + "\n")
+    logger.info("\n" + "="*60)
+    logger.info("🎉 RESEARCH COMPLETED!")
+    logger.info("="*60 + "\n")
     
     return report
 
@@ -305,12 +1036,12 @@ async def demo_research():
     query1 = "Latest AI Agent frameworks in 2025"
     report1 = await conduct_research(query1)
     
-    print("\n📊 REPORT PREVIEW:")
-    print("-"*60)
-    print(f"Summary: {report1.short_summary}\n")
-    print("Follow-up questions:")
+    logger.info("\n📊 REPORT PREVIEW:")
+    logger.info("-"*60)
+    logger.info(f"Summary: {report1.short_summary}\n")
+    logger.info("Follow-up questions:")
     for i, q in enumerate(report1.follow_up_questions, 1):
-        print(f"{i}. {q}")
+        logger.info(f"{i}. {q}")
     
     # Example 2: Uncomment to run additional research
     # query2 = "Impact of AI on software development jobs"
@@ -321,30 +1052,42 @@ async def main():
     """Run the deep research system."""
     
     # Verify environment
-    if not os.environ.get('OPENAI_API_KEY'):
-        print("❌ Error: OPENAI_API_KEY not found in .env file")
-        return
-    
-    if not os.environ.get('SENDGRID_API_KEY'):
-        print("❌ Error: SENDGRID_API_KEY not found in .env file")
+    required = {
+        'OPENAI_API_KEY': CREDENTIALS.openai_api_key,
+        'SENDGRID_API_KEY': CREDENTIALS.sendgrid_api_key,
+        'SENDER_EMAIL': CREDENTIALS.sender_email,
+        'RECIPIENT_EMAIL': CREDENTIALS.recipient_email,
+    }
+    for name, value in required.items():
+        if not value:
+            logger.info(f"❌ Error: {name} not found in .env file")
+            return
+    if SEARCH_CONTEXT_SIZE not in ("low", "medium", "high", "auto"):
+        logger.info(f"❌ Error: SEARCH_CONTEXT_SIZE must be low, medium, high, or auto in .env file (got {SEARCH_CONTEXT_SIZE!r})")
         return
     
-    print("\n" + "*"*60)
-    print("AI DEEP RESEARCH AGENT")
-    print("*"*60)
-    print(f"\nConfiguration:")
-    print(f"  - Searches per query: {HOW_MANY_SEARCHES}")
-    print(f"  - Search context size: {SEARCH_CONTEXT_SIZE}")
-    print(f"  - Estimated cost: ${HOW_MANY_SEARCHES * 0.025:.3f} - ${HOW_MANY_SEARCHES * 0.1:.3f}")
-    print()
+    logger.info("\n" + "*"*60)
+    logger.info("AI DEEP RESEARCH AGENT")
+    logger.info("*"*60)
+    logger.info(f"\nConfiguration:")
+    logger.info(f"  - Searches per query: {HOW_MANY_SEARCHES}")
+    logger.info(f"  - Search context size: {SEARCH_CONTEXT_SIZE}")
+    logger.info(f"  - Estimated cost: ${HOW_MANY_SEARCHES * 0.025:.3f} - ${HOW_MANY_SEARCHES * 0.1:.3f}")
+    logger.info("")
     
     # Run demonstration
-    await demo_research()
+    try:
+        await demo_research()
+    finally:
+        await sendgrid_http.aclose()
     
-    print("\n📊 View traces: https://platform.openai.com/traces")
-    print("💰 Check costs: https://platform.openai.com/usage")
-    print("📧 Check your email for the report!\n")
+    logger.info("\n📊 View traces: https://platform.openai.com/traces")
+    logger.info("💰 Check costs: https://platform.openai.com/usage")
+    logger.info("📧 Check your email for the report!\n")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -10,16 +10,77 @@ research tasks, including:
 """
 
 import asyncio
+import random
 import time
-from typing import List, Dict
+import sys
+import queue
+import atexit
+import logging
+import logging.handlers
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
+import openai
 
 from agents import Agent, WebSearchTool, Runner, trace
 from agents.model_settings import ModelSettings
 
+try:
+    import uvloop
+except ImportError:  # Windows, or interpreters without a uvloop wheel
+    uvloop = None
+
 
 load_dotenv(override=True)
 
+# Output goes through a queue: coroutines only enqueue records and a background
+# thread writes them out, so concurrent searches never block on stdout
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+# main() runs the patterns concurrently; while a pattern runs, its records are
+# collected here with its name instead of being written, and run_demo() logs
+# them as one block. Records logged with extra={"progress": True} are written
+# straight away, tagged with the pattern name, so progress stays live.
+_demo_output: ContextVar[Optional[Tuple[str, List[str]]]] = ContextVar("demo_output", default=None)
+
+
+class _HoldDemoOutput(logging.Filter):
+    """Divert records logged inside a running pattern into its buffer."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        held = _demo_output.get()
+        if held is None:
+            return True
+        name, lines = held
+        if getattr(record, "progress", False):
+            record.msg, record.args = f"[{name}] {record.getMessage()}", ()
+            return True
+        lines.append(record.getMessage())
+        return False
+
+
+logger.addFilter(_HoldDemoOutput())
+
+
+async def run_demo(name: str, demo: Callable[[], Awaitable[None]]) -> None:
+    """Run a pattern demo and log its buffered output together once it finishes."""
+    lines: List[str] = []
+    token = _demo_output.set((name, lines))
+    try:
+        await demo()
+    finally:
+        _demo_output.reset(token)
+        logger.info("\n".join(lines))
+
 
 # ============================================================================
 # AGENT SETUP
@@ -39,15 +100,84 @@ def create_search_agent():
     )
 
 
+# Shared by every pattern below; agents are stateless between runs, so one
+# instance serves any number of concurrent searches
+SEARCH_AGENT = create_search_agent()
+
+# main() runs every pattern at once, so cap the searches in flight across all
+# of them to stay within API rate limits
+MAX_CONCURRENT_SEARCHES = 8
+search_slots = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+
+
+_reserve_lock = asyncio.Lock()
+
+
+@asynccontextmanager
+async def reserved_slots(count: int):
+    """
+    Hold count search slots for the duration of the block.
+    
+    Patterns that time their searches reserve slots first, so the clock
+    starts once every search can run at once rather than while they queue
+    behind other patterns. Slots are taken under a lock so two reservations
+    can never each hold part of what they need.
+    """
+    async with _reserve_lock:
+        for _ in range(count):
+            await search_slots.acquire()
+    try:
+        yield
+    finally:
+        for _ in range(count):
+            search_slots.release()
+
+
+async def run_search(query: str, slot_held: bool = False):
+    """
+    Run the shared search agent on a query once a search slot is free.
+    
+    Args:
+        query: Search query
+        slot_held: The caller already holds a slot for this search through
+                   reserved_slots(), so don't take another
+    """
+    if slot_held:
+        return await Runner.run(SEARCH_AGENT, query)
+    async with search_slots:
+        return await Runner.run(SEARCH_AGENT, query)
+
+
+def dedupe_queries(queries: List[str]) -> Tuple[List[str], List[int]]:
+    """
+    Collapse queries that differ only in case or whitespace.
+    
+    Returns the distinct queries to dispatch, plus the index into that list
+    for each original query so results can be fanned back out in order.
+    """
+    first_seen: Dict[str, int] = {}
+    unique: List[str] = []
+    positions: List[int] = []
+    
+    for query in queries:
+        key = " ".join(query.lower().split())
+        if key not in first_seen:
+            first_seen[key] = len(unique)
+            unique.append(query)
+        positions.append(first_seen[key])
+    
+    return unique, positions
+
+
 # ============================================================================
 # PATTERN 1: Basic Parallel Searches
 # ============================================================================
 
 async def basic_parallel_searches():
     """Execute multiple searches in parallel."""
-    print("="*60)
-    print("Pattern 1: Basic Parallel Searches")
-    print("="*60 + "\n")
+    logger.info("="*60)
+    logger.info("Pattern 1: Basic Parallel Searches")
+    logger.info("="*60 + "\n")
     
     queries = [
         "OpenAI Agents SDK features",
@@ -55,50 +185,45 @@ async def basic_parallel_searches():
         "Crew AI framework overview"
     ]
     
-    agent = create_search_agent()
+    unique, positions = dedupe_queries(queries)
     
-    print(f"Executing {len(queries)} searches in parallel...")
-    start_time = time.time()
+    logger.info(f"Executing {len(unique)} searches in parallel...")
     
-    # Create tasks for parallel execution
-    tasks = [Runner.run(agent, query) for query in queries]
-    
-    # Wait for all to complete
-    results = await asyncio.gather(*tasks)
+    async with reserved_slots(len(unique)):
+        start_time = time.time()
+        
+        # Create tasks for parallel execution, one per distinct query; leaving
+        # the task group waits for all of them and cancels the rest if one fails
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(run_search(query, slot_held=True)) for query in unique]
+        
+        elapsed = time.time() - start_time
     
-    elapsed = time.time() - start_time
+    results = [tasks[i].result() for i in positions]
     
-    print(f"✅ Completed in {elapsed:.2f} seconds\n")
+    logger.info(f"✅ Completed in {elapsed:.2f} seconds\n")
     
     for i, (query, result) in enumerate(zip(queries, results), 1):
-        print(f"{i}. {query}")
-        print(f"   Result: {result.final_output[:100]}...")
-        print()
+        logger.info(f"{i}. {query}")
+        logger.info(f"   Result: {result.final_output[:100]}...")
+        logger.info("")
 
 
 # ============================================================================
 # PATTERN 2: Search with Timeout
 # ============================================================================
 
-async def search_with_timeout(query: str, timeout: int = 30):
-    """Execute search with timeout."""
-    agent = create_search_agent()
+async def parallel_with_timeouts(timeout: int = 30):
+    """
+    Execute parallel searches with timeout protection.
     
-    try:
-        result = await asyncio.wait_for(
-            Runner.run(agent, query),
-            timeout=timeout
-        )
-        return {"query": query, "result": result.final_output, "status": "success"}
-    except asyncio.TimeoutError:
-        return {"query": query, "result": None, "status": "timeout"}
-
-
-async def parallel_with_timeouts():
-    """Execute parallel searches with timeout protection."""
-    print("="*60)
-    print("Pattern 2: Parallel Searches with Timeouts")
-    print("="*60 + "\n")
+    One asyncio.timeout() deadline covers the whole group instead of a
+    wait_for() timer per search. When it expires, unfinished searches are
+    cancelled and the ones that already completed keep their results.
+    """
+    logger.info("="*60)
+    logger.info("Pattern 2: Parallel Searches with Timeouts")
+    logger.info("="*60 + "\n")
     
     queries = [
         "AI agent frameworks comparison",
@@ -106,16 +231,29 @@ async def parallel_with_timeouts():
         "LLM deployment best practices"
     ]
     
-    print(f"Executing {len(queries)} searches with 30s timeout...")
-    
-    tasks = [search_with_timeout(query, timeout=30) for query in queries]
-    results = await asyncio.gather(*tasks)
+    logger.info(f"Executing {len(queries)} searches with {timeout}s timeout...")
     
-    print("\nResults:")
-    for result in results:
-        status_icon = "✅" if result["status"] == "success" else "⏱️"
-        print(f"{status_icon} {result['query']}: {result['status']}")
-    print()
+    # The deadline starts once every search has a slot, so it only covers the
+    # searches themselves
+    async with reserved_slots(len(queries)):
+        tasks = [asyncio.create_task(run_search(query, slot_held=True)) for query in queries]
+        try:
+            async with asyncio.timeout(timeout):
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except TimeoutError:
+            # Let the cancelled searches finish unwinding before their slots
+            # are released
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    logger.info("\nResults:")
+    for query, task in zip(queries, tasks):
+        if task.cancelled():
+            logger.info(f"⏱️ {query}: timeout")
+        elif task.exception() is not None:
+            logger.info(f"❌ {query}: error ({task.exception()})")
+        else:
+            logger.info(f"✅ {query}: success")
+    logger.info("")
 
 
 # ============================================================================
@@ -124,9 +262,8 @@ async def parallel_with_timeouts():
 
 async def search_task(query: str, agent_id: int):
     """Execute a search task with ID."""
-    agent = create_search_agent()
     start = time.time()
-    result = await Runner.run(agent, query)
+    result = await run_search(query)
     elapsed = time.time() - start
     
     return {
@@ -138,18 +275,25 @@ async def search_task(query: str, agent_id: int):
 
 
 async def race_to_answer():
-    """Race multiple agents to answer first."""
-    print("="*60)
-    print("Pattern 3: Race Condition - First to Finish")
-    print("="*60 + "\n")
+    """
+    Race multiple agents to answer first.
+    
+    Losing searches are cancelled as soon as a winner finishes, and awaited so
+    their HTTP requests are torn down right away instead of lingering until
+    exit. Cancellation only avoids the WebSearchTool charge for racers whose
+    tool call has not started yet; searches already running are still billed.
+    """
+    logger.info("="*60)
+    logger.info("Pattern 3: Race Condition - First to Finish")
+    logger.info("="*60 + "\n")
     
     query = "What are AI agents?"
     num_agents = 3
     
-    print(f"Racing {num_agents} agents to answer: '{query}'...")
+    logger.info(f"Racing {num_agents} agents to answer: '{query}'...")
     
     # Create multiple tasks racing for the same query
-    tasks = [search_task(query, i+1) for i in range(num_agents)]
+    tasks = [asyncio.create_task(search_task(query, i+1)) for i in range(num_agents)]
     
     # Return when first one completes
     done, pending = await asyncio.wait(
@@ -157,44 +301,60 @@ async def race_to_answer():
         return_when=asyncio.FIRST_COMPLETED
     )
     
+    # Cancel remaining tasks and wait for their cleanup to finish
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    
     # Get the winner
     winner = list(done)[0].result()
     
-    print(f"\n🏆 Winner: Agent {winner['agent_id']}")
-    print(f"   Time: {winner['time']:.2f}s")
-    print(f"   Result: {winner['result'][:150]}...")
-    
-    # Cancel remaining tasks
-    for task in pending:
-        task.cancel()
+    logger.info(f"\n🏆 Winner: Agent {winner['agent_id']}")
+    logger.info(f"   Time: {winner['time']:.2f}s")
+    logger.info(f"   Result: {winner['result'][:150]}...")
     
-    print(f"\n   Cancelled {len(pending)} remaining tasks")
-    print()
+    logger.info(f"\n   Cancelled {len(pending)} remaining tasks")
+    logger.info("")
 
 
 # ============================================================================
 # PATTERN 4: Error Recovery
 # ============================================================================
 
+# Rate limits, timeouts, dropped connections and 5xx responses are worth retrying
+TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    asyncio.TimeoutError,
+)
+
+
 async def search_with_retry(query: str, max_retries: int = 3):
-    """Execute search with retry logic."""
-    agent = create_search_agent()
+    """
+    Execute search with retry logic.
     
+    Only transient failures are retried, with full-jitter exponential backoff
+    so parallel searches that fail together don't retry in lockstep. Other
+    errors (e.g. a bad API key) fail fast instead of paying for hopeless calls.
+    """
     for attempt in range(max_retries):
         try:
-            result = await Runner.run(agent, query)
+            result = await run_search(query)
             return {"query": query, "result": result.final_output, "attempts": attempt + 1}
-        except Exception as e:
+        except TRANSIENT_ERRORS as e:
             if attempt == max_retries - 1:
                 return {"query": query, "result": None, "error": str(e), "attempts": attempt + 1}
-            await asyncio.sleep(2 ** attempt)  # Exponential backoff
+            await asyncio.sleep(random.uniform(0, 2 ** attempt))  # Exponential backoff with jitter
+        except Exception as e:
+            return {"query": query, "result": None, "error": str(e), "attempts": attempt + 1}
 
 
 async def parallel_with_error_recovery():
     """Execute parallel searches with error recovery."""
-    print("="*60)
-    print("Pattern 4: Parallel Searches with Error Recovery")
-    print("="*60 + "\n")
+    logger.info("="*60)
+    logger.info("Pattern 4: Parallel Searches with Error Recovery")
+    logger.info("="*60 + "\n")
     
     queries = [
         "AI safety considerations",
@@ -202,20 +362,20 @@ async def parallel_with_error_recovery():
         "RAG implementation patterns"
     ]
     
-    print(f"Executing {len(queries)} searches with retry logic...")
+    logger.info(f"Executing {len(queries)} searches with retry logic...")
     
     tasks = [search_with_retry(query, max_retries=3) for query in queries]
     results = await asyncio.gather(*tasks, return_exceptions=True)
     
-    print("\nResults:")
+    logger.info("\nResults:")
     for result in results:
         if isinstance(result, Exception):
-            print(f"❌ Error: {result}")
+            logger.info(f"❌ Error: {result}")
         elif "error" in result:
-            print(f"❌ {result['query']}: Failed after {result['attempts']} attempts")
+            logger.info(f"❌ {result['query']}: Failed after {result['attempts']} attempts")
         else:
-            print(f"✅ {result['query']}: Success on attempt {result['attempts']}")
-    print()
+            logger.info(f"✅ {result['query']}: Success on attempt {result['attempts']}")
+    logger.info("")
 
 
 # ============================================================================
@@ -223,27 +383,37 @@ async def parallel_with_error_recovery():
 # ============================================================================
 
 async def batch_parallel_searches(queries: List[str], batch_size: int = 3):
-    """Process searches in batches to avoid overwhelming the API."""
-    print("="*60)
-    print("Pattern 5: Batch Processing with Concurrent Limits")
-    print("="*60 + "\n")
+    """
+    Process searches with at most batch_size in flight to avoid overwhelming the API.
     
-    agent = create_search_agent()
-    results = []
+    A semaphore bounds concurrency instead of fixed batches, so a slow search
+    only holds up its own slot and the next query starts as soon as any
+    slot frees up.
+    """
+    logger.info("="*60)
+    logger.info("Pattern 5: Batch Processing with Concurrent Limits")
+    logger.info("="*60 + "\n")
     
-    print(f"Processing {len(queries)} queries in batches of {batch_size}...")
+    semaphore = asyncio.Semaphore(batch_size)
     
-    for i in range(0, len(queries), batch_size):
-        batch = queries[i:i+batch_size]
-        print(f"\nBatch {i//batch_size + 1}: {len(batch)} queries")
-        
-        tasks = [Runner.run(agent, query) for query in batch]
-        batch_results = await asyncio.gather(*tasks)
-        results.extend(batch_results)
-        
-        print(f"  ✅ Completed batch {i//batch_size + 1}")
+    async def limited_search(query: str):
+        async with semaphore:
+            result = await run_search(query)
+        logger.info(f"✅ Completed: {query}", extra={"progress": True})
+        return result
+    
+    unique, positions = dedupe_queries(queries)
+    if len(unique) < len(queries):
+        logger.info(f"Skipping {len(queries) - len(unique)} duplicate queries")
     
-    print(f"\n✅ All {len(results)} searches completed")
+    logger.info(f"Processing {len(unique)} queries, {batch_size} at a time...\n")
+    
+    async with asyncio.TaskGroup() as tg:
+        tasks = [tg.create_task(limited_search(query)) for query in unique]
+    
+    results = [tasks[i].result() for i in positions]
+    
+    logger.info(f"\n✅ All {len(results)} searches completed")
     return results
 
 
@@ -261,7 +431,7 @@ async def demo_batch_processing():
     ]
     
     await batch_parallel_searches(queries, batch_size=3)
-    print()
+    logger.info("")
 
 
 # ============================================================================
@@ -270,20 +440,19 @@ async def demo_batch_processing():
 
 async def search_with_progress(query: str, index: int, total: int):
     """Execute search with progress reporting."""
-    agent = create_search_agent()
-    print(f"[{index}/{total}] Starting: {query[:50]}...")
+    logger.info(f"[{index}/{total}] Starting: {query[:50]}...", extra={"progress": True})
     
-    result = await Runner.run(agent, query)
+    result = await run_search(query)
     
-    print(f"[{index}/{total}] ✅ Completed: {query[:50]}...")
+    logger.info(f"[{index}/{total}] ✅ Completed: {query[:50]}...", extra={"progress": True})
     return result.final_output
 
 
 async def parallel_with_progress():
     """Execute parallel searches with progress tracking."""
-    print("="*60)
-    print("Pattern 6: Parallel Searches with Progress Tracking")
-    print("="*60 + "\n")
+    logger.info("="*60)
+    logger.info("Pattern 6: Parallel Searches with Progress Tracking")
+    logger.info("="*60 + "\n")
     
     queries = [
         "Multimodal AI applications",
@@ -302,8 +471,8 @@ async def parallel_with_progress():
     
     results = await asyncio.gather(*tasks)
     
-    print(f"\n✅ All {total} searches completed!")
-    print()
+    logger.info(f"\n✅ All {total} searches completed!")
+    logger.info("")
 
 
 # ============================================================================
@@ -313,46 +482,46 @@ async def parallel_with_progress():
 async def main():
     """Run all parallel research pattern demonstrations."""
     
-    print("\n" + "*"*60)
-    print("PARALLEL RESEARCH PATTERNS")
-    print("*"*60 + "\n")
-    
-    print("⚠️  Cost Warning: These demos use WebSearchTool")
-    print("   Each search costs ~$0.025")
-    print("   Total estimated cost: $0.30 - $0.60")
-    print()
-    
-    # Demo 1: Basic parallel
-    await basic_parallel_searches()
-    
-    # Demo 2: With timeouts
-    await parallel_with_timeouts()
-    
-    # Demo 3: Race condition
-    await race_to_answer()
-    
-    # Demo 4: Error recovery
-    await parallel_with_error_recovery()
-    
-    # Demo 5: Batch processing
-    await demo_batch_processing()
-    
-    # Demo 6: Progress tracking
-    await parallel_with_progress()
-    
-    print("*"*60)
-    print("All demonstrations completed!")
-    print("*"*60)
-    print("\nKey Patterns Demonstrated:")
-    print("1. Basic parallel execution with asyncio.gather()")
-    print("2. Timeout protection with asyncio.wait_for()")
-    print("3. Race conditions with asyncio.wait()")
-    print("4. Error recovery with retry logic")
-    print("5. Batch processing to limit concurrency")
-    print("6. Progress tracking for user feedback")
-    print("\n📊 Check traces: https://platform.openai.com/traces")
-    print()
+    logger.info("\n" + "*"*60)
+    logger.info("PARALLEL RESEARCH PATTERNS")
+    logger.info("*"*60 + "\n")
+    
+    logger.info("⚠️  Cost Warning: These demos use WebSearchTool")
+    logger.info("   Each search costs ~$0.025")
+    logger.info("   Total estimated cost: $0.30 - $0.60")
+    logger.info("")
+    
+    # The demos are independent, so run them all at once; search_slots keeps
+    # the combined number of searches in flight bounded, and each demo's
+    # output is printed as one block when it finishes, apart from progress lines
+    demos = (
+        ("Pattern 1", basic_parallel_searches),       # Basic parallel
+        ("Pattern 2", parallel_with_timeouts),        # With timeouts
+        ("Pattern 3", race_to_answer),                # Race condition
+        ("Pattern 4", parallel_with_error_recovery),  # Error recovery
+        ("Pattern 5", demo_batch_processing),         # Batch processing
+        ("Pattern 6", parallel_with_progress),        # Progress tracking
+    )
+    async with asyncio.TaskGroup() as tg:
+        for name, demo in demos:
+            tg.create_task(run_demo(name, demo))
+    
+    logger.info("*"*60)
+    logger.info("All demonstrations completed!")
+    logger.info("*"*60)
+    logger.info("\nKey Patterns Demonstrated:")
+    logger.info("1. Basic parallel execution with asyncio.TaskGroup()")
+    logger.info("2. Timeout protection with asyncio.timeout()")
+    logger.info("3. Race conditions with asyncio.wait()")
+    logger.info("4. Error recovery with retry logic")
+    logger.info("5. Batch processing to limit concurrency")
+    logger.info("6. Progress tracking for user feedback")
+    logger.info("\n📊 Check traces: https://platform.openai.com/traces")
+    logger.info("")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
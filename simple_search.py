@@ -12,11 +12,17 @@ COST NOTE: WebSearchTool costs ~$0.025 per search call
 """
 
 import os
+import re
 import asyncio
 from dotenv import load_dotenv
 from agents import Agent, WebSearchTool, trace, Runner
 from agents.model_settings import ModelSettings
 
+try:
+    import uvloop
+except ImportError:  # Windows, or interpreters without a uvloop wheel
+    uvloop = None
+
 
 # Load environment variables
 load_dotenv(override=True)
@@ -50,6 +56,18 @@ def create_search_agent(context_size: str = "low"):
     )
 
 
+# One agent per context size, built once and reused by every search
+SEARCH_AGENTS = {size: create_search_agent(size) for size in ("low", "medium", "high")}
+
+
+_WORD_RE = re.compile(r"\S+")
+
+
+def count_words(text: str) -> int:
+    """Count whitespace-separated words without building a list of them."""
+    return sum(1 for _ in _WORD_RE.finditer(text))
+
+
 async def simple_search(query: str, context_size: str = "low"):
     """
     Perform a simple web search and return summary.
@@ -66,8 +84,7 @@ async def simple_search(query: str, context_size: str = "low"):
     print(f"Context size: {context_size}")
     print(f"{'='*60}\n")
     
-    # Create agent
-    search_agent = create_search_agent(context_size)
+    search_agent = SEARCH_AGENTS[context_size]
     
     # Execute search with tracing
     with trace(f"Simple Search: {query[:30]}..."):
@@ -89,14 +106,18 @@ async def compare_context_sizes(query: str):
     
     context_sizes = ["low", "medium", "high"]
     
-    for size in context_sizes:
+    # The searches are independent, so run them concurrently
+    results = await asyncio.gather(
+        *(simple_search(query, context_size=size) for size in context_sizes)
+    )
+    
+    for size, result in zip(context_sizes, results):
         print(f"\n\n{'─'*60}")
         print(f"CONTEXT SIZE: {size.upper()}")
         print(f"{'─'*60}\n")
         
-        result = await simple_search(query, context_size=size)
         print(result)
-        print(f"\nWord count: {len(result.split())}")
+        print(f"\nWord count: {count_words(result)}")
 
 
 async def multiple_searches():
@@ -111,8 +132,9 @@ async def multiple_searches():
     print("MULTIPLE SEARCH QUERIES")
     print("="*60)
     
-    for query in queries:
-        result = await simple_search(query)
+    results = await asyncio.gather(*(simple_search(query) for query in queries))
+    
+    for query, result in zip(queries, results):
         print(f"\n{'-'*60}")
         print(f"Query: {query}")
         print(f"{'-'*60}")
@@ -168,4 +190,7 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -11,23 +11,180 @@ Benefits:
 - Self-documenting schemas
 """
 
+from __future__ import annotations
+
 import asyncio
-from typing import List, Optional
+import hashlib
+import io
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Type
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field
+
+import orjson
+
+# The Agents SDK (and the openai/httpx stack under it) takes most of this
+# module's import time, so it is imported where it is first used. That keeps
+# the models importable on their own without paying for it.
+if TYPE_CHECKING:
+    import httpx
+    from agents import Agent, AgentOutputSchema
 
-from agents import Agent, Runner, trace
+try:
+    import uvloop
+except ImportError:  # Windows, or interpreters without a uvloop wheel
+    uvloop = None
 
 
 load_dotenv(override=True)
 
 
+# ============================================================================
+# SHARED CLIENT AND SCHEMAS
+# ============================================================================
+
+# Send all five demos as one request instead of five (COMBINED_DEMOS=1)
+COMBINED_DEMOS = os.environ.get('COMBINED_DEMOS', '').lower() in ('1', 'true', 'yes')
+
+# Upper bound on demo requests in flight at once
+MAX_CONCURRENT_REQUESTS = 8
+
+_request_slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+
+def configure_openai_client() -> httpx.AsyncClient:
+    """
+    Route every agent through one OpenAI client with a pooled HTTP transport.
+    
+    The demos run concurrently, so sharing one HTTP/2 client lets their
+    requests share connections instead of each setting up its own.
+    
+    Returns:
+        The underlying HTTP client, for the caller to close when done
+    """
+    import httpx
+    from openai import AsyncOpenAI
+    from agents import set_default_openai_client
+    
+    http_client = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=32,
+            max_keepalive_connections=32,
+            keepalive_expiry=30.0,
+        ),
+        timeout=httpx.Timeout(60.0),
+    )
+    set_default_openai_client(AsyncOpenAI(http_client=http_client))
+    return http_client
+
+
+async def run_agent(
+    agent: Agent,
+    query: str,
+    on_partial: Optional[Callable[[Dict[str, Any]], None]] = None,
+):
+    """
+    Run an agent on a query once a request slot is free.
+    
+    Args:
+        agent: Agent to run
+        query: Input for the agent
+        on_partial: If given, the response is streamed and this is called with
+            the output parsed so far each time more of it arrives
+        
+    Returns:
+        The run result, with the validated final output
+    """
+    from jiter import from_json
+    from openai.types.responses import ResponseTextDeltaEvent
+    from agents import Runner
+    
+    async with _request_slots:
+        if on_partial is None:
+            return await Runner.run(agent, query)
+        
+        result = Runner.run_streamed(agent, query)
+        buffer = ""
+        async for event in result.stream_events():
+            if event.type != "raw_response_event" or not isinstance(event.data, ResponseTextDeltaEvent):
+                continue
+            
+            buffer += event.data.delta
+            try:
+                partial = from_json(buffer.encode(), partial_mode=True)
+            except ValueError:
+                continue
+            if isinstance(partial, dict):
+                on_partial(partial)
+        
+        return result
+
+
+@lru_cache(maxsize=None)
+def output_schema(model: Type[BaseModel]) -> AgentOutputSchema:
+    """
+    Build the SDK output schema for a model once and reuse it.
+    
+    Given a bare model class, the SDK regenerates the JSON schema and
+    validator on every run; an AgentOutputSchema instance is used as-is.
+    """
+    from agents import AgentOutputSchema
+    
+    return AgentOutputSchema(model)
+
+
+def _emit(buf: io.StringIO) -> None:
+    """Write a demo's buffered output to stdout in one call."""
+    sys.stdout.write(buf.getvalue())
+    sys.stdout.flush()
+
+
+# Validated outputs from earlier runs; delete the directory to force fresh calls
+DEMO_CACHE_DIR = Path(".demo_cache")
+
+
+async def cached_run(
+    agent: Agent,
+    query: str,
+    output_type: Type[BaseModel],
+    on_partial: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> BaseModel:
+    """
+    Run an agent, reusing its validated output from an earlier identical run.
+    
+    The cache key covers the model, instructions, query and output schema, so
+    changing any of them causes a fresh call. on_partial is passed on to
+    run_agent and is not called on a cache hit.
+    """
+    schema = orjson.dumps(output_schema(output_type).json_schema(), option=orjson.OPT_SORT_KEYS)
+    key = hashlib.sha256(
+        f"{agent.model}|{agent.instructions}|{query}|".encode() + schema
+    ).hexdigest()
+    path = DEMO_CACHE_DIR / f"{key}.json"
+    
+    if path.exists():
+        return output_type.model_validate_json(path.read_bytes())
+    
+    result = await run_agent(agent, query, on_partial)
+    DEMO_CACHE_DIR.mkdir(exist_ok=True)
+    path.write_text(result.final_output.model_dump_json())
+    return result.final_output
+
+
 # ============================================================================
 # EXAMPLE 1: Simple Structured Output
 # ============================================================================
 
 class CompanyInfo(BaseModel):
     """Schema for company information."""
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", str_strip_whitespace=True, validate_assignment=False
+    )
+    
     name: str = Field(description="Company name")
     industry: str = Field(description="Primary industry")
     founded_year: int = Field(description="Year founded")
@@ -35,32 +192,48 @@ class CompanyInfo(BaseModel):
     description: str = Field(description="Brief company description")
 
 
-async def demo_simple_structure():
-    """Demonstrate basic structured output."""
-    print("="*60)
-    print("Demo 1: Simple Structured Output")
-    print("="*60 + "\n")
+@lru_cache(maxsize=None)
+def _simple_agent() -> Agent:
+    """Build the company agent on first use."""
+    from agents import Agent
     
-    agent = Agent(
+    return Agent(
         name="Company Researcher",
         instructions="Extract company information from the query.",
         model="gpt-4o-mini",
-        output_type=CompanyInfo
+        output_type=output_schema(CompanyInfo)
     )
+
+
+_SIMPLE_QUERY = "Tell me about Anthropic, the AI safety company"
+
+
+async def demo_simple_structure(company: Optional[CompanyInfo] = None) -> io.StringIO:
+    """
+    Demonstrate basic structured output.
     
-    query = "Tell me about Anthropic, the AI safety company"
+    Args:
+        company: Output from a combined request; requested here when omitted
+    """
+    buf = io.StringIO()
+    buf.write("="*60 + "\n")
+    buf.write("Demo 1: Simple Structured Output\n")
+    buf.write("="*60 + "\n\n")
     
-    with trace("Simple Structure Demo"):
-        result = await Runner.run(agent, query)
+    if company is None:
+        from agents import custom_span
+        
+        with custom_span("Simple Structure Demo"):
+            company = await cached_run(_simple_agent(), _SIMPLE_QUERY, CompanyInfo)
     
-    company = result.final_output
+    buf.write(f"Company: {company.name}\n")
+    buf.write(f"Industry: {company.industry}\n")
+    buf.write(f"Founded: {company.founded_year}\n")
+    buf.write(f"Employees: {company.employee_count}\n")
+    buf.write(f"Description: {company.description}\n")
+    buf.write("\n")
     
-    print(f"Company: {company.name}")
-    print(f"Industry: {company.industry}")
-    print(f"Founded: {company.founded_year}")
-    print(f"Employees: {company.employee_count}")
-    print(f"Description: {company.description}")
-    print()
+    return buf
 
 
 # ============================================================================
@@ -69,6 +242,10 @@ async def demo_simple_structure():
 
 class Feature(BaseModel):
     """Schema for a product feature."""
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", str_strip_whitespace=True, validate_assignment=False
+    )
+    
     name: str = Field(description="Feature name")
     description: str = Field(description="What the feature does")
     benefit: str = Field(description="User benefit")
@@ -76,6 +253,10 @@ class Feature(BaseModel):
 
 class ProductAnalysis(BaseModel):
     """Schema for product analysis."""
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", str_strip_whitespace=True, validate_assignment=False
+    )
+    
     product_name: str = Field(description="Product name")
     category: str = Field(description="Product category")
     key_features: List[Feature] = Field(description="List of key features")
@@ -83,36 +264,53 @@ class ProductAnalysis(BaseModel):
     competitive_advantage: str = Field(description="Main competitive advantage")
 
 
-async def demo_nested_structure():
-    """Demonstrate nested structured output."""
-    print("="*60)
-    print("Demo 2: Nested Structured Output")
-    print("="*60 + "\n")
+@lru_cache(maxsize=None)
+def _product_agent() -> Agent:
+    """Build the product agent on first use."""
+    from agents import Agent
     
-    agent = Agent(
+    return Agent(
         name="Product Analyst",
         instructions="Analyze the product and extract structured information.",
         model="gpt-4o-mini",
-        output_type=ProductAnalysis
+        output_type=output_schema(ProductAnalysis)
     )
+
+
+_PRODUCT_QUERY = "Analyze the iPhone as a product"
+
+
+async def demo_nested_structure(analysis: Optional[ProductAnalysis] = None) -> io.StringIO:
+    """
+    Demonstrate nested structured output.
     
-    query = "Analyze the iPhone as a product"
+    Args:
+        analysis: Output from a combined request; requested here when omitted
+    """
+    buf = io.StringIO()
+    buf.write("="*60 + "\n")
+    buf.write("Demo 2: Nested Structured Output\n")
+    buf.write("="*60 + "\n\n")
     
-    with trace("Nested Structure Demo"):
-        result = await Runner.run(agent, query)
+    if analysis is None:
+        from agents import custom_span
+        
+        with custom_span("Nested Structure Demo"):
+            analysis = await cached_run(_product_agent(), _PRODUCT_QUERY, ProductAnalysis)
     
-    analysis = result.final_output
+    buf.write(f"Product: {analysis.product_name}\n")
+    buf.write(f"Category: {analysis.category}\n")
+    buf.write(f"Target Audience: {analysis.target_audience}\n")
+    buf.write(f"Competitive Advantage: {analysis.competitive_advantage}\n")
+    buf.write(f"\nKey Features ({len(analysis.key_features)}):\n")
+    # Output is already validated; iterate plain dicts rather than models
+    for i, feature in enumerate(analysis.model_dump()["key_features"], 1):
+        buf.write(f"\n{i}. {feature['name']}\n")
+        buf.write(f"   Description: {feature['description']}\n")
+        buf.write(f"   Benefit: {feature['benefit']}\n")
+    buf.write("\n")
     
-    print(f"Product: {analysis.product_name}")
-    print(f"Category: {analysis.category}")
-    print(f"Target Audience: {analysis.target_audience}")
-    print(f"Competitive Advantage: {analysis.competitive_advantage}")
-    print(f"\nKey Features ({len(analysis.key_features)}):")
-    for i, feature in enumerate(analysis.key_features, 1):
-        print(f"\n{i}. {feature.name}")
-        print(f"   Description: {feature.description}")
-        print(f"   Benefit: {feature.benefit}")
-    print()
+    return buf
 
 
 # ============================================================================
@@ -121,76 +319,86 @@ async def demo_nested_structure():
 
 class ResearchPaper(BaseModel):
     """Schema for research paper with validation."""
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", str_strip_whitespace=True, validate_assignment=False
+    )
+    
     title: str = Field(description="Paper title")
-    authors: List[str] = Field(description="List of authors")
-    year: int = Field(description="Publication year")
+    authors: List[str] = Field(description="List of authors", min_length=1)
+    year: int = Field(description="Publication year", ge=1900, le=2030)
     abstract: str = Field(description="Paper abstract")
     key_findings: List[str] = Field(
         description="List of 3-5 key findings",
         min_length=3,
         max_length=5
     )
-    
-    @validator('year')
-    def validate_year(cls, v):
-        """Ensure year is reasonable."""
-        if v < 1900 or v > 2030:
-            raise ValueError('Year must be between 1900 and 2030')
-        return v
-    
-    @validator('authors')
-    def validate_authors(cls, v):
-        """Ensure at least one author."""
-        if len(v) < 1:
-            raise ValueError('Must have at least one author')
-        return v
 
 
-async def demo_validated_structure():
-    """Demonstrate validated structured output."""
-    print("="*60)
-    print("Demo 3: Validated Structured Output")
-    print("="*60 + "\n")
+@lru_cache(maxsize=None)
+def _paper_agent() -> Agent:
+    """Build the paper agent on first use."""
+    from agents import Agent
     
-    agent = Agent(
+    return Agent(
         name="Paper Analyzer",
         instructions="Extract structured information about the research paper.",
         model="gpt-4o-mini",
-        output_type=ResearchPaper
+        output_type=output_schema(ResearchPaper)
     )
+
+
+_PAPER_QUERY = """Analyze this paper: 'Attention Is All You Need' by Vaswani et al., published in 2017. 
+It introduced the Transformer architecture for neural networks."""
+
+
+async def demo_validated_structure(paper: Optional[ResearchPaper] = None) -> io.StringIO:
+    """
+    Demonstrate validated structured output.
     
-    query = """Analyze this paper: 'Attention Is All You Need' by Vaswani et al., published in 2017. 
-    It introduced the Transformer architecture for neural networks."""
-    
-    with trace("Validated Structure Demo"):
-        result = await Runner.run(agent, query)
+    Args:
+        paper: Output from a combined request; requested here when omitted
+    """
+    buf = io.StringIO()
+    buf.write("="*60 + "\n")
+    buf.write("Demo 3: Validated Structured Output\n")
+    buf.write("="*60 + "\n\n")
     
-    paper = result.final_output
+    if paper is None:
+        from agents import custom_span
+        
+        with custom_span("Validated Structure Demo"):
+            paper = await cached_run(_paper_agent(), _PAPER_QUERY, ResearchPaper)
     
-    print(f"Title: {paper.title}")
-    print(f"Authors: {', '.join(paper.authors)}")
-    print(f"Year: {paper.year}")
-    print(f"Abstract: {paper.abstract}")
-    print(f"\nKey Findings ({len(paper.key_findings)}):")
+    buf.write(f"Title: {paper.title}\n")
+    buf.write(f"Authors: {', '.join(paper.authors)}\n")
+    buf.write(f"Year: {paper.year}\n")
+    buf.write(f"Abstract: {paper.abstract}\n")
+    buf.write(f"\nKey Findings ({len(paper.key_findings)}):\n")
     for i, finding in enumerate(paper.key_findings, 1):
-        print(f"{i}. {finding}")
-    print()
+        buf.write(f"{i}. {finding}\n")
+    buf.write("\n")
+    
+    return buf
 
 
 # ============================================================================
-# EXAMPLE 4: Optional Fields
+# EXAMPLE 4: Fallback Values for Missing Data
 # ============================================================================
 
 class ArticleSummary(BaseModel):
-    """Schema for article summary with optional fields."""
+    """Schema for article summary with fields that may be missing."""
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", str_strip_whitespace=True, validate_assignment=False
+    )
+    
     headline: str = Field(description="Article headline")
-    author: Optional[str] = Field(
-        default=None,
-        description="Article author (if available)"
+    # Strict schemas make every field required anyway, so the fallback text
+    # is asked for in the description rather than set as a default
+    author: str = Field(
+        description='Article author, or "Not specified" if not stated'
     )
-    date: Optional[str] = Field(
-        default=None,
-        description="Publication date (if available)"
+    date: str = Field(
+        description='Publication date, or "Not specified" if not stated'
     )
     summary: str = Field(description="Brief summary of the article")
     sentiment: str = Field(
@@ -199,34 +407,50 @@ class ArticleSummary(BaseModel):
     topics: List[str] = Field(description="Main topics covered")
 
 
-async def demo_optional_fields():
-    """Demonstrate optional fields in structured output."""
-    print("="*60)
-    print("Demo 4: Optional Fields")
-    print("="*60 + "\n")
+@lru_cache(maxsize=None)
+def _article_agent() -> Agent:
+    """Build the article agent on first use."""
+    from agents import Agent
     
-    agent = Agent(
+    return Agent(
         name="Article Summarizer",
         instructions="Summarize the article and extract structured information.",
         model="gpt-4o-mini",
-        output_type=ArticleSummary
+        output_type=output_schema(ArticleSummary)
     )
+
+
+_ARTICLE_QUERY = """Summarize: AI agents are transforming software development. 
+They can write code, debug, and even deploy applications autonomously."""
+
+
+async def demo_fallback_fields(summary: Optional[ArticleSummary] = None) -> io.StringIO:
+    """
+    Demonstrate fields that fall back to a stated value when data is missing.
     
-    query = """Summarize: AI agents are transforming software development. 
-    They can write code, debug, and even deploy applications autonomously."""
+    Args:
+        summary: Output from a combined request; requested here when omitted
+    """
+    buf = io.StringIO()
+    buf.write("="*60 + "\n")
+    buf.write("Demo 4: Fallback Values for Missing Data\n")
+    buf.write("="*60 + "\n\n")
     
-    with trace("Optional Fields Demo"):
-        result = await Runner.run(agent, query)
+    if summary is None:
+        from agents import custom_span
+        
+        with custom_span("Fallback Fields Demo"):
+            summary = await cached_run(_article_agent(), _ARTICLE_QUERY, ArticleSummary)
     
-    summary = result.final_output
+    buf.write(f"Headline: {summary.headline}\n")
+    buf.write(f"Author: {summary.author}\n")
+    buf.write(f"Date: {summary.date}\n")
+    buf.write(f"Sentiment: {summary.sentiment}\n")
+    buf.write(f"Topics: {', '.join(summary.topics)}\n")
+    buf.write(f"\nSummary: {summary.summary}\n")
+    buf.write("\n")
     
-    print(f"Headline: {summary.headline}")
-    print(f"Author: {summary.author or 'Not specified'}")
-    print(f"Date: {summary.date or 'Not specified'}")
-    print(f"Sentiment: {summary.sentiment}")
-    print(f"Topics: {', '.join(summary.topics)}")
-    print(f"\nSummary: {summary.summary}")
-    print()
+    return buf
 
 
 # ============================================================================
@@ -235,16 +459,22 @@ async def demo_optional_fields():
 
 class SourceReference(BaseModel):
     """Schema for a source reference."""
-    title: str = Field(description="Source title or description")
-    url: Optional[str] = Field(
-        default=None,
-        description="URL if available"
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", str_strip_whitespace=True, validate_assignment=False
     )
+    
+    title: str = Field(description="Source title or description")
+    # An empty string rather than null keeps the schema entry a plain string
+    url: str = Field(description="URL if available, otherwise an empty string")
     relevance: str = Field(description="Why this source is relevant")
 
 
 class DetailedReport(BaseModel):
     """Schema for a comprehensive research report."""
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", str_strip_whitespace=True, validate_assignment=False
+    )
+    
     executive_summary: str = Field(
         description="2-3 sentence executive summary"
     )
@@ -267,45 +497,126 @@ class DetailedReport(BaseModel):
     )
 
 
-async def demo_complex_schema():
-    """Demonstrate complex nested schema."""
-    print("="*60)
-    print("Demo 5: Complex Research Schema")
-    print("="*60 + "\n")
+@lru_cache(maxsize=None)
+def _report_agent() -> Agent:
+    """Build the report agent on first use."""
+    from agents import Agent
     
-    agent = Agent(
+    return Agent(
         name="Research Analyst",
         instructions="""You are a research analyst. Create a comprehensive report 
         on the given topic with structured findings, analysis, and recommendations.""",
         model="gpt-4o-mini",
-        output_type=DetailedReport
+        output_type=output_schema(DetailedReport)
     )
+
+
+_REPORT_QUERY = "Analyze the impact of AI on software development productivity"
+
+
+def _numbered(items: List[str]) -> str:
+    """Format items as a numbered list, one per line."""
+    return "".join(f"{i}. {item}\n" for i, item in enumerate(items, 1))
+
+
+def _fmt_source(source: Dict[str, Any]) -> str:
+    """Format a dumped SourceReference as an indented block of lines."""
+    url = f"  URL: {source['url']}\n" if source["url"] else ""
+    return f"- {source['title']}\n{url}  Relevance: {source['relevance']}\n"
+
+
+async def demo_complex_schema(output: Optional[DetailedReport] = None) -> io.StringIO:
+    """
+    Demonstrate complex nested schema.
+    
+    Args:
+        output: Output from a combined request; requested here when omitted
+    """
+    buf = io.StringIO()
+    buf.write("="*60 + "\n")
+    buf.write("Demo 5: Complex Research Schema\n")
+    buf.write("="*60 + "\n\n")
+    
+    # Stream the report and print the summary and first finding as soon as
+    # they are complete, rather than after the long analysis field finishes.
+    # Incomplete strings are dropped in partial mode, so a present field is done.
+    previewed = set()
     
-    query = "Analyze the impact of AI on software development productivity"
+    def preview(partial: Dict[str, Any]) -> None:
+        if "executive_summary" in partial and "summary" not in previewed:
+            previewed.add("summary")
+            print(f"⏳ Report summary (streaming): {partial['executive_summary']}\n")
+        findings = partial.get("main_findings") or []
+        if findings and "finding" not in previewed:
+            previewed.add("finding")
+            print(f"⏳ First finding (streaming): {findings[0]}\n")
     
-    with trace("Complex Schema Demo"):
-        result = await Runner.run(agent, query)
+    if output is None:
+        from agents import custom_span
+        
+        with custom_span("Complex Schema Demo"):
+            output = await cached_run(_report_agent(), _REPORT_QUERY, DetailedReport, on_partial=preview)
     
-    report = result.final_output
+    # Output is already validated; dump once and read plain dicts from here on
+    report = output.model_dump()
     
-    print(f"Executive Summary:\n{report.executive_summary}\n")
+    buf.write(f"Executive Summary:\n{report['executive_summary']}\n\n")
     
-    print(f"Main Findings ({len(report.main_findings)}):")
-    for i, finding in enumerate(report.main_findings, 1):
-        print(f"{i}. {finding}")
+    buf.write(f"Main Findings ({len(report['main_findings'])}):\n")
+    buf.write(_numbered(report["main_findings"]))
     
-    print(f"\nSources ({len(report.sources)}):")
-    for source in report.sources:
-        print(f"- {source.title}")
-        if source.url:
-            print(f"  URL: {source.url}")
-        print(f"  Relevance: {source.relevance}")
+    buf.write(f"\nSources ({len(report['sources'])}):\n")
+    buf.write("".join(_fmt_source(source) for source in report["sources"]))
+    
+    buf.write(f"\nRecommendations ({len(report['recommendations'])}):\n")
+    buf.write(_numbered(report["recommendations"]))
+    
+    buf.write(f"\nLimitations:\n{report['limitations']}\n\n")
+    
+    return buf
+
+
+# ============================================================================
+# COMBINED REQUEST: All Demos in One Call
+# ============================================================================
+
+class AllDemos(BaseModel):
+    """Outputs of all five demos, returned by a single request."""
+    model_config = ConfigDict(
+        frozen=True, extra="forbid", str_strip_whitespace=True, validate_assignment=False
+    )
     
-    print(f"\nRecommendations ({len(report.recommendations)}):")
-    for i, rec in enumerate(report.recommendations, 1):
-        print(f"{i}. {rec}")
+    simple: CompanyInfo = Field(description="Answer to task 1")
+    product: ProductAnalysis = Field(description="Answer to task 2")
+    paper: ResearchPaper = Field(description="Answer to task 3")
+    article: ArticleSummary = Field(description="Answer to task 4")
+    report: DetailedReport = Field(description="Answer to task 5")
+
+
+@lru_cache(maxsize=None)
+def _all_agent() -> Agent:
+    """Build the combined agent on first use."""
+    from agents import Agent
     
-    print(f"\nLimitations:\n{report.limitations}\n")
+    return Agent(
+        name="Combined Analyst",
+        instructions="""You are given five independent tasks. Complete each one on its
+        own and put each answer in the output field for that task.""",
+        model="gpt-4o-mini",
+        output_type=output_schema(AllDemos)
+    )
+
+
+_ALL_QUERY = "\n\n".join(
+    f"### Task {i} ({field})\n{query}"
+    for i, (field, query) in enumerate([
+        ("simple", _SIMPLE_QUERY),
+        ("product", _PRODUCT_QUERY),
+        ("paper", _PAPER_QUERY),
+        ("article", _ARTICLE_QUERY),
+        ("report", _REPORT_QUERY),
+    ], 1)
+)
 
 
 async def main():
@@ -314,11 +625,39 @@ async def main():
     print("STRUCTURED OUTPUTS DEMONSTRATIONS")
     print("*"*60 + "\n")
     
-    await demo_simple_structure()
-    await demo_nested_structure()
-    await demo_validated_structure()
-    await demo_optional_fields()
-    await demo_complex_schema()
+    from agents import custom_span, trace
+    
+    http_client = configure_openai_client()
+    
+    try:
+        # One trace for the whole run; each demo is a child span within it
+        with trace("All Demos"):
+            if COMBINED_DEMOS:
+                # One request returns every demo's output; the demos only
+                # format it
+                with custom_span("Combined Demos"):
+                    outputs = await cached_run(_all_agent(), _ALL_QUERY, AllDemos)
+                blocks = await asyncio.gather(
+                    demo_simple_structure(outputs.simple),
+                    demo_nested_structure(outputs.product),
+                    demo_validated_structure(outputs.paper),
+                    demo_fallback_fields(outputs.article),
+                    demo_complex_schema(outputs.report),
+                )
+            else:
+                # The demos are independent API calls, so run them
+                # concurrently and print each one's output afterwards, in order
+                blocks = await asyncio.gather(
+                    demo_simple_structure(),
+                    demo_nested_structure(),
+                    demo_validated_structure(),
+                    demo_fallback_fields(),
+                    demo_complex_schema(),
+                )
+            for buf in blocks:
+                _emit(buf)
+    finally:
+        await http_client.aclose()
     
     print("*"*60)
     print("All demonstrations completed!")
@@ -326,12 +665,15 @@ async def main():
     print("\nKey Takeaways:")
     print("- Pydantic models ensure type-safe responses")
     print("- Field descriptions guide the AI's output")
-    print("- Validators enforce constraints")
-    print("- Optional fields handle missing data")
+    print("- Field constraints (ge, le, min_length) enforce valid values")
+    print("- Clear fallbacks in field descriptions handle missing data")
     print("- Nested models support complex structures")
     print("\n📊 Check traces: https://platform.openai.com/traces")
     print()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())